@@ -0,0 +1,651 @@
+"""
+News-to-Script Automation Tool - Shared pipeline
+Scraping, deduplication and Telegram delivery shared by every driver script.
+
+Drivers (e.g. main.py for Groq) only provide a `generate_script` callable and
+hand it to `run_pipeline`, so all scraping/delivery optimizations live here
+and are applied once instead of per LLM backend.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import random
+import time
+from collections.abc import Callable
+from io import BytesIO
+from urllib.parse import urljoin
+
+# Third-party imports (aiohttp, requests, bs4, lxml, selectolax, ...) are
+# deferred into the functions that use them: module load then costs only
+# stdlib + config, which matters for scheduled CI cold starts. Check with
+# `python -X importtime main.py` when touching this.
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Target website
+BASE_URL = "https://www.bloombergtechnoz.com"
+POPULAR_URL = f"{BASE_URL}/"
+
+# Scraping settings
+ARTICLE_COUNT = 5
+REQUEST_TIMEOUT = 10
+CONCURRENT_REQUESTS = 4
+REQUEST_JITTER = 0.5
+FETCH_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+CONTENT_MAX_CHARS = 2500  # only ~2000 chars per article ever reach the LLM prompt
+LARGE_PAGE_BYTES = 512 * 1024  # stream-parse pages above this size instead of building a tree
+
+# User-Agent header
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/121.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# Cache settings (reruns within the TTL skip the network entirely)
+CACHE_FILE = "http_cache.sqlite"
+CACHE_TTL = 1800  # 30 minutes
+
+# Manifest of {url: sha1(content)} from the previous run, kept via the Actions cache
+SEEN_FILE = "seen.json"
+
+@functools.lru_cache(maxsize=1)
+def get_session():
+    """Shared session so repeat hits to the same hosts reuse pooled TCP+TLS
+    connections. GETs are additionally cached on disk; the LLM/Telegram POSTs
+    are never cached. Built lazily on first use."""
+    from requests.adapters import HTTPAdapter, Retry
+    from requests_cache import CachedSession
+
+    session = CachedSession(
+        CACHE_FILE,
+        expire_after=CACHE_TTL,
+        allowable_methods=["GET"],
+        allowable_codes=[200],
+    )
+    session.headers.update(HEADERS)
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+        ),
+    )
+    return session
+
+# =============================================================================
+# SCRAPER MODULE
+# =============================================================================
+
+
+def fetch_page_content(url: str) -> bytes:
+    import requests
+
+    try:
+        response = get_session().get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        # Raw bytes: the HTML parsers sniff the charset themselves in C, so
+        # requests' pure-Python encoding detection (.text) is skipped
+        return response.content
+    except requests.RequestException as e:
+        print(f"Error fetching {url}: {e}")
+        return b""
+
+
+def get_popular_articles() -> list[dict]:
+    from selectolax.lexbor import LexborHTMLParser
+
+    print(f"Fetching popular articles from {POPULAR_URL}...")
+
+    html_content = fetch_page_content(POPULAR_URL)
+    if not html_content:
+        raise Exception("Failed to fetch homepage content")
+
+    tree = LexborHTMLParser(html_content)
+    articles = []
+
+    popular_list = tree.css_first("ul.list-terpopuler")
+
+    if popular_list is None:
+        print("Warning: Could not find popular section")
+        article_elements = tree.css("article")[:ARTICLE_COUNT]
+    else:
+        article_elements = popular_list.css("li")[:ARTICLE_COUNT]
+
+    if not article_elements:
+        # Lexbor found nothing usable; retry with the slower BeautifulSoup path
+        return _get_popular_articles_bs4(html_content)
+
+    print(f"Found {len(article_elements)} article elements")
+
+    for element in article_elements:
+        title_tag = element.css_first("h5.title")
+        if title_tag is None:
+            title_tag = element.css_first("h2, h3, h4, h5, h6")
+        if title_tag is None:
+            title_tag = element.css_first("a")
+
+        if title_tag is None:
+            continue
+
+        title = title_tag.text(strip=True)
+        if not title:
+            continue
+
+        link_tag = element.css_first("a[href]")
+        if link_tag is None:
+            link_tag = title_tag if title_tag.tag == "a" else None
+
+        if link_tag is None:
+            continue
+
+        article_url = link_tag.attributes.get("href") or ""
+        if not article_url:
+            continue
+
+        article_url = urljoin(f"{BASE_URL}/", article_url)
+
+        articles.append({"title": title, "url": article_url})
+        print(f"  - Found: {title[:50]}...")
+
+    return articles[:ARTICLE_COUNT]
+
+
+@functools.lru_cache(maxsize=1)
+def _popular_strainer():
+    # Strainer lets bs4 build only the subtree we care about instead of the full page
+    from bs4 import SoupStrainer
+
+    return SoupStrainer("ul", class_="list-terpopuler")
+
+
+@functools.lru_cache(maxsize=1)
+def _article_selector_sv():
+    # Pre-compiled soupsieve selector for the bs4 homepage fallback
+    import soupsieve as sv
+
+    return sv.compile("article")
+
+
+def _get_popular_articles_bs4(html_content: bytes) -> list[dict]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, "lxml", parse_only=_popular_strainer())
+    articles = []
+
+    popular_list = soup.find("ul", class_="list-terpopuler")
+
+    if not popular_list:
+        # Strained parse found nothing; redo a full parse for the generic fallback
+        soup = BeautifulSoup(html_content, "lxml")
+        popular_list = soup.find("ul", class_="list-terpopuler")
+
+    if not popular_list:
+        article_elements = _article_selector_sv().select(soup, limit=ARTICLE_COUNT)
+    else:
+        article_elements = popular_list.find_all("li", limit=ARTICLE_COUNT)
+
+    print(f"Found {len(article_elements)} article elements (bs4 fallback)")
+
+    for element in article_elements:
+        title_tag = element.find("h5", class_="title")
+        if not title_tag:
+            title_tag = element.find(["h2", "h3", "h4", "h5", "h6"])
+        if not title_tag:
+            title_tag = element.find("a")
+
+        if not title_tag:
+            continue
+
+        title = title_tag.get_text(strip=True)
+        if not title:
+            continue
+
+        link_tag = element.find("a", href=True)
+        if not link_tag:
+            link_tag = title_tag if title_tag.name == "a" else None
+
+        if not link_tag:
+            continue
+
+        article_url = urljoin(f"{BASE_URL}/", link_tag["href"])
+
+        articles.append({"title": title, "url": article_url})
+        print(f"  - Found: {title[:50]}...")
+
+    return articles[:ARTICLE_COUNT]
+
+
+CONTENT_SELECTORS = [".article-content", ".post-content", ".entry-content", "article", ".content", "main"]
+
+
+@functools.lru_cache(maxsize=1)
+def _content_xpaths():
+    # Pre-compiled XPath expressions for the lxml article-content fallback, most
+    # specific first; evaluated directly on the lxml tree without bs4 Tag wrappers
+    from lxml import etree
+
+    return [
+        etree.XPath('//div[contains(@class, "detail-in")]'),
+        etree.XPath('//*[contains(@class, "article-content")]'),
+        etree.XPath('//*[contains(@class, "post-content")]'),
+        etree.XPath('//*[contains(@class, "entry-content")]'),
+        etree.XPath("//article"),
+        etree.XPath('//*[contains(@class, "content")]'),
+        etree.XPath("//main"),
+    ]
+
+
+def extract_article_content(html_content: bytes) -> str:
+    from selectolax.lexbor import LexborHTMLParser
+
+    if not html_content:
+        return ""
+
+    if len(html_content) > LARGE_PAGE_BYTES:
+        # A full tree for a page this size peaks at several times the HTML size;
+        # stream paragraphs instead and stop as soon as the content cap is hit
+        return _extract_article_content_stream(html_content)
+
+    tree = LexborHTMLParser(html_content)
+    tree.strip_tags(["script", "style", "noscript", "iframe", "nav", "footer", "header"])
+
+    content_tag = tree.css_first("div.detail-in")
+
+    if content_tag is None:
+        for selector in CONTENT_SELECTORS:
+            content_tag = tree.css_first(selector)
+            if content_tag is not None:
+                break
+
+    if content_tag is None:
+        # Lexbor could not locate a content container; retry with raw lxml XPath
+        return _extract_article_content_lxml(html_content)
+
+    content_parts = []
+    total = 0
+    for p in content_tag.css("p"):
+        text = p.text(strip=True)
+        if text and len(text) > 20:
+            content_parts.append(text)
+            total += len(text) + 1
+            if total > CONTENT_MAX_CHARS:
+                break
+
+    return " ".join(content_parts)
+
+
+def _extract_article_content_lxml(html_content: bytes) -> str:
+    from lxml import etree
+    from lxml import html as lxmlhtml
+
+    try:
+        doc = lxmlhtml.fromstring(html_content)
+    except (etree.ParserError, ValueError):
+        return ""
+
+    for xpath in _content_xpaths():
+        nodes = xpath(doc)
+        if nodes:
+            container = nodes[0]
+            break
+    else:
+        container = doc
+
+    etree.strip_elements(
+        container, "script", "style", "noscript", "iframe", "nav", "footer", "header",
+        with_tail=False,
+    )
+
+    # Single C-level pass: text_content() collects all text under each <p>
+    content_parts = []
+    total = 0
+    for p in container.iter("p"):
+        text = p.text_content().strip()
+        if len(text) > 20:
+            content_parts.append(text)
+            total += len(text) + 1
+            if total > CONTENT_MAX_CHARS:
+                break
+
+    return " ".join(content_parts)
+
+
+def _extract_article_content_stream(html_content: bytes) -> str:
+    from lxml import etree
+
+    # Incremental parse: each <p> is inspected and discarded, so memory stays
+    # constant. No container scoping here; the length filter plus the content
+    # cap keep navigation scraps from dominating the result.
+    content_parts = []
+    total = 0
+
+    try:
+        for _event, element in etree.iterparse(
+            BytesIO(html_content),
+            events=("end",),
+            tag="p",
+            html=True,
+            remove_comments=True,
+        ):
+            text = "".join(element.itertext()).strip()
+            element.clear(keep_tail=True)
+            if len(text) > 20:
+                content_parts.append(text)
+                total += len(text) + 1
+                if total > CONTENT_MAX_CHARS:
+                    break
+    except etree.XMLSyntaxError:
+        return ""
+
+    return " ".join(content_parts)
+
+
+def _retry_after_seconds(header_value: str | None) -> float | None:
+    if not header_value:
+        return None
+    try:
+        return min(float(header_value), BACKOFF_MAX)
+    except ValueError:
+        # HTTP-date form; not worth parsing for this scraper
+        return None
+
+
+def _backoff_delay(attempt: int) -> float:
+    return min(BACKOFF_BASE * 2**attempt, BACKOFF_MAX) + random.uniform(0, REQUEST_JITTER)
+
+
+async def fetch_page(session: aiohttp.ClientSession, url: str) -> bytes:
+    import aiohttp
+
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+
+    for attempt in range(FETCH_RETRIES):
+        try:
+            async with session.get(url, timeout=timeout) as response:
+                if response.status in (429, 503):
+                    # Server is pushing back: honor Retry-After, else back off exponentially
+                    delay = _retry_after_seconds(response.headers.get("Retry-After"))
+                    if delay is None:
+                        delay = _backoff_delay(attempt)
+                    print(f"  Got {response.status} from {url}, retrying in {delay:.1f}s...")
+                    await asyncio.sleep(delay)
+                    continue
+                response.raise_for_status()
+                return await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == FETCH_RETRIES - 1:
+                print(f"Error fetching {url}: {e}")
+                return b""
+            await asyncio.sleep(_backoff_delay(attempt))
+
+    print(f"Error fetching {url}: retries exhausted")
+    return b""
+
+
+async def scrape_one_article(
+    session: aiohttp.ClientSession, article: dict, semaphore: asyncio.Semaphore
+) -> dict:
+    async with semaphore:
+        # Small random delay so concurrent requests don't hit the host at once
+        await asyncio.sleep(random.uniform(0, REQUEST_JITTER))
+        print(f"  Scraping: {article['url']}")
+        html_content = await fetch_page(session, article["url"])
+
+    content = extract_article_content(html_content)
+
+    if not content:
+        print(f"  Warning: Could not extract content from {article['url']}")
+
+    return {
+        "title": article["title"],
+        "url": article["url"],
+        "content": content,
+    }
+
+
+async def scrape_all_articles(articles: list[dict]) -> list[dict]:
+    import aiohttp
+
+    semaphore = asyncio.Semaphore(CONCURRENT_REQUESTS)
+    connector = aiohttp.TCPConnector(limit_per_host=4, keepalive_timeout=30)
+
+    async with aiohttp.ClientSession(headers=HEADERS, connector=connector) as session:
+        tasks = [scrape_one_article(session, article, semaphore) for article in articles]
+        return list(await asyncio.gather(*tasks))
+
+
+# =============================================================================
+# DEDUPLICATION MODULE (skip articles unchanged since the previous run)
+# =============================================================================
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def load_seen_hashes() -> dict[str, str]:
+    try:
+        with open(SEEN_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_seen_hashes(seen: dict[str, str]) -> None:
+    try:
+        with open(SEEN_FILE, "w", encoding="utf-8") as f:
+            json.dump(seen, f)
+    except OSError as e:
+        print(f"Warning: Could not save {SEEN_FILE}: {e}")
+
+
+# =============================================================================
+# DELIVERY MODULE (Telegram Bot)
+# =============================================================================
+
+
+# Escape table for Telegram HTML parse mode: a single C-level table walk
+# instead of html.escape's three full-buffer str.replace passes
+_HTML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+# Per-message budget under Telegram's 4096-char limit
+TELEGRAM_CHUNK_CHARS = 3900
+
+# Format-once message templates, applied with .format() in the send path
+HEADER_TEMPLATE = """📰 NEWS-TO-SCRIPT - Berita Tech Harian
+📅 {date}
+
+{body}
+
+---
+Dibuat oleh News-to-Script Automation"""
+
+ERROR_TEMPLATE = "❌ Error Otomasi\n\n{body}\n\nPeriksa log GitHub Actions."
+
+
+@functools.lru_cache(maxsize=1)
+def _today(stamp: str) -> str:
+    # Keyed on a YYYYMMDD stamp so the cached string rolls over at midnight
+    return time.strftime("%A, %d %B %Y")
+
+
+def _split_message(text: str, limit: int = TELEGRAM_CHUNK_CHARS) -> list[str]:
+    if len(text) <= limit:
+        return [text]
+
+    chunks = []
+    current = ""
+    for paragraph in text.split("\n\n"):
+        candidate = f"{current}\n\n{paragraph}" if current else paragraph
+        if len(candidate) <= limit:
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+        # Hard-split paragraphs that alone exceed the limit
+        while len(paragraph) > limit:
+            chunks.append(paragraph[:limit])
+            paragraph = paragraph[limit:]
+        current = paragraph
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+def send_to_telegram(text: str, bot_token: str, chat_id: str, is_error: bool = False) -> bool:
+    import requests
+
+    if not text:
+        print("Skip Telegram: No content to send.")
+        return False
+
+    print("Sending script to Telegram...")
+
+    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+
+    text = text.translate(_HTML_ESCAPE)
+
+    if is_error:
+        message = ERROR_TEMPLATE.format(body=text)
+    else:
+        message = HEADER_TEMPLATE.format(date=_today(time.strftime("%Y%m%d")), body=text)
+
+    # Long scripts are split on paragraph boundaries instead of truncated.
+    # Chunks go out sequentially over the pooled keep-alive session so they
+    # arrive in order; only the first one triggers a notification.
+    chunks = _split_message(message)
+    if len(chunks) > 1:
+        print(f"Message split into {len(chunks)} Telegram chunks")
+
+    all_ok = True
+    for i, chunk in enumerate(chunks):
+        payload = {
+            "chat_id": chat_id,
+            "text": chunk,
+            "parse_mode": "HTML",
+            "disable_web_page_preview": True,
+            "disable_notification": i > 0,
+        }
+
+        try:
+            response = get_session().post(url, json=payload, timeout=REQUEST_TIMEOUT)
+
+            # Print response for debugging
+            print(f"Telegram response status: {response.status_code}")
+            print(f"Telegram response: {response.text[:200]}")
+
+            response.raise_for_status()
+
+            result = response.json()
+            if not result.get("ok"):
+                print(f"Telegram API error: {result}")
+                all_ok = False
+
+        except requests.RequestException as e:
+            print(f"Error sending to Telegram: {e}")
+            all_ok = False
+
+    if all_ok:
+        print("Script sent to Telegram successfully!")
+    return all_ok
+
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+
+
+def run_pipeline(
+    generate_script: Callable[[list[dict], str], str | None],
+    api_key_env: str = "GROQ_API_KEY",
+) -> bool:
+    print("=" * 60)
+    print("News-to-Script Automation Tool")
+    print("=" * 60)
+
+    api_key = os.getenv(api_key_env)
+    telegram_bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
+    telegram_chat_id = os.getenv("TELEGRAM_CHAT_ID")
+
+    if not api_key:
+        print(f"ERROR: {api_key_env} not set")
+        return False
+
+    if not telegram_bot_token:
+        print("ERROR: TELEGRAM_BOT_TOKEN not set")
+        return False
+
+    if not telegram_chat_id:
+        print("ERROR: TELEGRAM_CHAT_ID not set")
+        return False
+
+    try:
+        print("\n[Step 1] Scraping popular articles...")
+        articles = get_popular_articles()
+
+        if not articles:
+            raise Exception("No articles found")
+
+        print(f"\n[Step 2] Scraping full content from {len(articles)} articles...")
+        scraped_articles = asyncio.run(scrape_all_articles(articles))
+
+        valid_articles = [a for a in scraped_articles if a["content"]]
+        if not valid_articles:
+            valid_articles = scraped_articles
+
+        seen_hashes = load_seen_hashes()
+        current_hashes = {a["url"]: content_hash(a["content"]) for a in valid_articles}
+        new_articles = [
+            a for a in valid_articles if seen_hashes.get(a["url"]) != current_hashes[a["url"]]
+        ]
+
+        if not new_articles:
+            print("\nAll articles unchanged since last run; skipping script generation")
+            send_to_telegram(
+                "Tidak ada berita baru sejak run terakhir.",
+                telegram_bot_token,
+                telegram_chat_id,
+            )
+            save_seen_hashes({**seen_hashes, **current_hashes})
+            return True
+
+        if len(new_articles) < len(valid_articles):
+            print(f"\nSkipping {len(valid_articles) - len(new_articles)} unchanged article(s)")
+
+        print(f"\n[Step 3] Generating script...")
+        script = generate_script(new_articles, api_key)
+
+        if not script or script.startswith("Error:"):
+            raise Exception(f"Script generation failed: {script}")
+
+        print(f"\n[Step 4] Sending to Telegram...")
+        success = send_to_telegram(script, telegram_bot_token, telegram_chat_id)
+
+        if success:
+            save_seen_hashes({**seen_hashes, **current_hashes})
+
+        print("\n" + "=" * 60)
+        print("Execution completed!" if success else "Execution completed with errors")
+        print("=" * 60)
+
+        return success
+
+    except Exception as e:
+        print(f"\nFATAL ERROR: {e}")
+        send_to_telegram(str(e) + "\n\nCheck GitHub Actions logs.", telegram_bot_token, telegram_chat_id, is_error=True)
+        return False